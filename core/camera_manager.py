@@ -1,14 +1,22 @@
 import cv2
 import numpy as np
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 from dataclasses import dataclass
 from loguru import logger
 import time
 import threading
-import queue
-import yaml
 from pathlib import Path
 
+from core.utils import load_yaml
+
+
+# 配置中的旋转角度 → OpenCV 旋转常量
+_ROTATE_CODES = {
+    90: cv2.ROTATE_90_CLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_COUNTERCLOCKWISE,
+}
+
 
 @dataclass
 class CameraConfig:
@@ -20,16 +28,27 @@ class CameraConfig:
     height: int
     fps: int
     rotate: int
+    buffer_size: int = 1  # 驱动端缓存帧数（越小延迟越低）
 
 
 class CameraManager:
     """摄像头管理类：针对单摄像头的启动、捕获与状态管理"""
 
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, frame_callback: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            config_path: 摄像头配置文件路径
+            frame_callback: 有新帧可取时在采集线程中调用（槽位由空变满时才调用，
+                            消费者未取走前不会重复通知），需自行保证线程安全
+        """
         self.camera: Optional[CameraConfig] = None
+        self.frame_callback = frame_callback
         self.capture_thread: Optional[threading.Thread] = None
         self.stop_event = threading.Event()
-        self.frame_queue: "queue.Queue[np.ndarray]" = queue.Queue(maxsize=1)
+        # 单槽最新帧：采集线程覆盖写入，界面线程取走后置空
+        self._latest_frame: Optional[np.ndarray] = None
+        self._frame_lock = threading.Lock()
+        self._rotate_code: Optional[int] = None
         self.load_config(config_path)
 
     def _cleanup_camera_thread(self) -> None:
@@ -42,11 +61,8 @@ class CameraManager:
         if self.capture_thread.is_alive():
             logger.warning("摄像头线程未正常退出")
 
-        try:
-            while True:
-                self.frame_queue.get_nowait()
-        except queue.Empty:
-            pass
+        with self._frame_lock:
+            self._latest_frame = None
 
         self.capture_thread = None
         logger.debug("已清理摄像头资源")
@@ -54,8 +70,7 @@ class CameraManager:
     def load_config(self, config_path: str) -> None:
         """从 YAML 文件加载单个摄像头配置"""
         try:
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f) or {}
+            config = load_yaml(config_path)
 
             camera_cfg = config.get('camera')
             if not camera_cfg:
@@ -70,6 +85,7 @@ class CameraManager:
                 height=camera_cfg['resolution']['height'],
                 fps=camera_cfg.get('fps', 30),
                 rotate=camera_cfg.get('rotate', 0),
+                buffer_size=max(1, int(camera_cfg.get('buffer_size', 1))),
             )
             logger.info("成功加载摄像头配置")
         except Exception as e:
@@ -91,6 +107,7 @@ class CameraManager:
             return True
 
         self.stop_event.clear()
+        self._rotate_code = _ROTATE_CODES.get(self.camera.rotate)
 
         self.capture_thread = threading.Thread(
             target=self._capture_frames,
@@ -112,6 +129,7 @@ class CameraManager:
             return
 
         cam_config = self.camera
+        rotate_code = self._rotate_code
         cap: Optional[cv2.VideoCapture] = None
 
         try:
@@ -122,14 +140,23 @@ class CameraManager:
                 logger.error(f"无法打开摄像头，源：{cam_config.source}")
                 return
 
+            if isinstance(source, int):
+                # USB 摄像头改用 MJPG 传输，降低总线带宽（需在设置分辨率前设置）
+                cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, cam_config.buffer_size)
             cap.set(cv2.CAP_PROP_FRAME_WIDTH, cam_config.width)
             cap.set(cv2.CAP_PROP_FRAME_HEIGHT, cam_config.height)
             cap.set(cv2.CAP_PROP_FPS, cam_config.fps)
 
             logger.info("摄像头打开成功")
 
+            # 被新帧覆盖、从未被取走的旧帧仍归采集线程所有，复用其内存作为解码缓冲
+            spare: Optional[np.ndarray] = None
+            # 需要旋转时，解码结果只作为旋转输入、从不发布，可始终复用同一块内存
+            raw: Optional[np.ndarray] = None
+
             while not self.stop_event.is_set():
-                ret, frame = cap.read()
+                ret, frame = cap.read(raw if rotate_code is not None else spare)
                 if not ret:
                     logger.warning("摄像头读取失败")
                     source_path = cam_config.source
@@ -139,19 +166,13 @@ class CameraManager:
                     time.sleep(1)
                     continue
 
-                if cam_config.rotate == 90:
-                    frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-                elif cam_config.rotate == 180:
-                    frame = cv2.rotate(frame, cv2.ROTATE_180)
-                elif cam_config.rotate == 270:
-                    frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
+                if rotate_code is not None:
+                    raw = frame
+                    frame = cv2.rotate(raw, rotate_code, dst=spare)
 
-                if self.frame_queue.full():
-                    try:
-                        self.frame_queue.get_nowait()
-                    except queue.Empty:
-                        pass
-                self.frame_queue.put(frame)
+                spare = self._publish_frame(frame)
+                if spare is None and self.frame_callback is not None:
+                    self.frame_callback()
 
         except Exception as e:
             logger.error(f"摄像头捕获线程出错: {e}")
@@ -160,23 +181,38 @@ class CameraManager:
                 cap.release()
             logger.info("摄像头捕获线程退出")
 
+    def _publish_frame(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        """发布最新帧，返回被覆盖且未被取走的旧帧（若有）"""
+        with self._frame_lock:
+            stale, self._latest_frame = self._latest_frame, frame
+        return stale
+
     def get_frame(self) -> Optional[np.ndarray]:
-        """获取最新帧"""
-        try:
-            return self.frame_queue.get_nowait()
-        except queue.Empty:
+        """
+        取走最新帧（未被取走的旧帧会被新帧直接覆盖）
+
+        返回的数组归调用方所有，采集线程不会再写入它。
+        """
+        # 无新帧时直接返回，免去加锁（属性读取本身是原子的）
+        if self._latest_frame is None:
             return None
+        with self._frame_lock:
+            frame, self._latest_frame = self._latest_frame, None
+        return frame
+
+    def is_running(self) -> bool:
+        """采集线程是否在运行"""
+        return self.capture_thread is not None and self.capture_thread.is_alive()
 
     def get_camera_status(self) -> Dict[str, object]:
         """获取摄像头状态信息"""
         if self.camera is None:
             return {}
 
-        running = self.capture_thread is not None and self.capture_thread.is_alive()
         return {
             'id': self.camera.id,
             'name': self.camera.name,
-            'running': running,
-            'frame_queue_size': self.frame_queue.qsize(),
+            'running': self.is_running(),
+            'frame_queue_size': 0 if self._latest_frame is None else 1,
             'enabled': self.camera.enabled,
         }
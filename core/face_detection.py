@@ -1,12 +1,62 @@
+# -*- coding: utf-8 -*-
+
 import cv2
 import numpy as np
+import onnxruntime
 from insightface.app import FaceAnalysis
+from insightface.app.common import Face as InsightFace
+from insightface.utils import face_align
 from loguru import logger
 from typing import List, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
+import hashlib
+import os
 import time
-# -*- coding: utf-8 -*-
+
+from core.utils import IMAGE_EXTS
+
+
+# 批量提取特征时每批的人脸数（限制输入张量的内存占用）
+_EMBED_BATCH_SIZE = 32
+
+# 检测输入边长的取值范围（SCRFD 要求为 32 的倍数）
+_DET_SIZE_MIN = 160
+_DET_SIZE_MAX = 1280
+
+
+def _file_digest(path: Path) -> str:
+    """计算图片文件内容的 BLAKE2b 摘要（128 位十六进制串）"""
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def _round_det_size(size: int) -> int:
+    """将检测输入边长限制在合法范围内并取整为 32 的倍数"""
+    size = int(round(int(size) / 32)) * 32
+    return max(_DET_SIZE_MIN, min(_DET_SIZE_MAX, size))
+
+
+# 沿用上一帧特征时，新旧人脸框的最小交并比
+_REUSE_IOU = 0.6
+
+
+def _box_iou(boxes: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """计算两组 (x1, y1, x2, y2) 人脸框两两之间的交并比，返回 (N, M) 矩阵"""
+    ix1 = np.maximum(boxes[:, None, 0], others[None, :, 0])
+    iy1 = np.maximum(boxes[:, None, 1], others[None, :, 1])
+    ix2 = np.minimum(boxes[:, None, 2], others[None, :, 2])
+    iy2 = np.minimum(boxes[:, None, 3], others[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    other_area = (others[:, 2] - others[:, 0]) * (others[:, 3] - others[:, 1])
+    return inter / (area[:, None] + other_area[None, :] - inter + 1e-6)
+
+
+# 人脸库目录下的特征缓存文件（按文件名 + 修改时间 + 大小判断是否失效，失效时再按内容哈希查找）
+_EMBED_CACHE_NAME = '.embeddings.npz'
+
+
 # 人脸信息数据结构（单张检测结果）
 @dataclass
 class Face:
@@ -16,7 +66,7 @@ class Face:
     embedding: np.ndarray     # 人脸特征向量
     age: Optional[int] = None
     gender: Optional[str] = None  # 'Male' / 'Female'
-    face_img: Optional[np.ndarray] = None  # 裁剪后的人脸图像
+    face_img: Optional[np.ndarray] = None  # 裁剪后的人脸图像（原图视图，需长期保存时请自行 copy）
 
 # 已知人脸数据结构
 @dataclass
@@ -35,8 +85,25 @@ class FaceDetector:
         self.detection_threshold = config['recognition']['detection_threshold']      # 检测阈值
         self.device = config['recognition']['device']                               # CPU / GPU
         self.analysis_enabled = config['recognition'].get('analysis_enabled', True) # 是否启用年龄性别分析
+        self.genderage_min_score = config['recognition'].get('genderage_min_score', 0.6)     # 年龄性别分析的最低检测置信度
+        self.genderage_min_face_size = config['recognition'].get('genderage_min_face_size', 48)  # 年龄性别分析的最小人脸边长（像素）
+        self.use_tensorrt = config['recognition'].get('tensorrt', False)            # CUDA 下是否启用 TensorRT FP16
+        self.cpu_threads = config['recognition'].get('cpu_threads', 0)              # CPU 推理线程数（0 为 ONNXRuntime 默认）
+        self.det_size = _round_det_size(config['recognition'].get('det_size', 640))  # 检测模型输入边长
+        self.skip_static_frames = config['recognition'].get('skip_static_frames', False)  # 画面未变化时复用上一帧检测结果
+        self.motion_threshold = float(config['recognition'].get('motion_threshold', 0))  # 静态画面判定改用缩略图平均像素差（0 为使用 dHash）
+        self.embedding_reuse_frames = int(config['recognition'].get('embedding_reuse_frames', 0))  # 位置未变的人脸沿用特征的最多帧数（0 为逐帧提取）
+        self._tensorrt_options: Optional[dict] = None  # 实际启用的 TensorRT 后端参数（未启用时为 None）
         self.model = self._load_model()   # 加载 InsightFace 模型
         self.known_faces: List[KnownFace] = []  # 已知人脸列表
+        # 识别用快照：(已知人脸, L2 归一化后的特征矩阵 (N, D) float32)，人脸库变化时整体替换
+        self._known_index: Tuple[List[KnownFace], np.ndarray] = ([], np.empty((0, 0), dtype=np.float32))
+        # 静态画面跳过检测：上一帧的画面哈希与检测结果
+        self._last_frame_hash: Optional[bytes] = None
+        self._last_thumb: Optional[np.ndarray] = None  # motion_threshold 模式下上次检测时的 32x32 灰度缩略图
+        self._last_faces: List[Face] = []
+        # 特征沿用：上一帧每张人脸的 (人脸框, 特征, 已连续沿用的帧数)
+        self._embed_tracks: List[Tuple[np.ndarray, np.ndarray, int]] = []
 
     def _load_model(self) -> FaceAnalysis:
         """加载 InsightFace 模型"""
@@ -44,67 +111,320 @@ class FaceDetector:
             model = FaceAnalysis(
                 name='buffalo_l',
                 root='./models',
-                allowed_modules=['detection', 'recognition', 'genderage']
+                allowed_modules=['detection', 'recognition', 'genderage'],
+                providers=self._select_providers()
             )
             model.prepare(
                 ctx_id=0 if self.device == 'cuda' else -1,  # GPU 或 CPU 模式
                 det_thresh=self.detection_threshold,
-                det_size=(640, 640)
+                det_size=(self.det_size, self.det_size)
             )
+            if self.device != 'cuda' and self.cpu_threads > 0:
+                self._limit_cpu_threads(model)
+            if self._tensorrt_options is not None:
+                self._apply_trt_profiles(model)
             logger.success("人脸检测模型加载成功")
             return model
         except Exception as e:
             logger.error(f"加载人脸检测模型失败: {e}")
             raise
 
+    def _select_providers(self) -> list:
+        """根据设备配置选择 ONNXRuntime 执行后端（按优先级排列）"""
+        if self.device != 'cuda':
+            return ['CPUExecutionProvider']
+
+        available = onnxruntime.get_available_providers()
+        providers: list = ['CUDAExecutionProvider', 'CPUExecutionProvider']
+        if self.use_tensorrt:
+            if 'TensorrtExecutionProvider' in available:
+                # FP16 引擎构建耗时较长，缓存到磁盘后续启动直接加载
+                cache_dir = Path('./models/trt_cache')
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                self._tensorrt_options = {
+                    'trt_fp16_enable': True,
+                    'trt_engine_cache_enable': True,
+                    'trt_engine_cache_path': str(cache_dir),
+                }
+                providers.insert(0, ('TensorrtExecutionProvider', self._tensorrt_options))
+            else:
+                logger.warning("当前 onnxruntime 不支持 TensorRT，使用 CUDA 后端")
+
+        return [p for p in providers
+                if (p[0] if isinstance(p, tuple) else p) in available]
+
+    def _apply_trt_profiles(self, model: FaceAnalysis) -> None:
+        """为检测与识别模型声明 TensorRT 输入形状范围，避免批量大小或检测边长变化时重新构建引擎"""
+        profiles = {
+            # 检测：批量固定为 1，边长覆盖 det_size 的全部可调范围
+            'detection': ((1, 3, _DET_SIZE_MIN, _DET_SIZE_MIN),
+                          (1, 3, self.det_size, self.det_size),
+                          (1, 3, _DET_SIZE_MAX, _DET_SIZE_MAX)),
+            # 识别：批量从单张人脸到人脸库加载时的最大批量
+            'recognition': ((1, 3, 112, 112),
+                            (1, 3, 112, 112),
+                            (_EMBED_BATCH_SIZE, 3, 112, 112)),
+        }
+        for task, shapes in profiles.items():
+            sub_model = model.models.get(task)
+            if sub_model is None:
+                continue
+            input_name = sub_model.session.get_inputs()[0].name
+            min_shape, opt_shape, max_shape = (
+                f"{input_name}:{'x'.join(str(d) for d in shape)}" for shape in shapes)
+            options = dict(self._tensorrt_options,
+                           trt_profile_min_shapes=min_shape,
+                           trt_profile_opt_shapes=opt_shape,
+                           trt_profile_max_shapes=max_shape)
+            sub_model.session = onnxruntime.InferenceSession(
+                sub_model.model_file,
+                providers=[('TensorrtExecutionProvider', options),
+                           'CUDAExecutionProvider', 'CPUExecutionProvider']
+            )
+        logger.info("已为检测与识别模型设置 TensorRT 输入形状范围")
+
+    def _limit_cpu_threads(self, model: FaceAnalysis) -> None:
+        """以限定线程数的 SessionOptions 重建各子模型会话，避免推理线程抢占界面与采集线程"""
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = self.cpu_threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        for sub_model in model.models.values():
+            sub_model.session = onnxruntime.InferenceSession(
+                sub_model.model_file,
+                sess_options=options,
+                providers=['CPUExecutionProvider']
+            )
+        logger.info(f"CPU 推理线程数限定为 {self.cpu_threads}")
+
+    def set_det_size(self, size: int) -> int:
+        """运行时调整检测模型输入边长（越小越快，但远处小脸更容易漏检），返回实际生效的边长"""
+        self.det_size = _round_det_size(size)
+        self.model.det_model.input_size = (self.det_size, self.det_size)
+        return self.det_size
+
     def load_known_faces(self, known_faces_dir: str) -> None:
-        """从目录加载已知人脸库"""
+        """从目录加载已知人脸库（未变化的图片直接复用缓存特征，其余检测对齐后分批提取）"""
         try:
             self.known_faces.clear()
             known_faces_dir = Path(known_faces_dir)
 
             if not known_faces_dir.exists():
                 logger.warning(f"目录不存在: {known_faces_dir}")
+                self._rebuild_known_index()
                 return
 
-            for face_file in known_faces_dir.glob('*.*'):
-                if face_file.suffix.lower() not in ['.jpg', '.jpeg', '.png']:
-                    continue
-
+            cache_path = known_faces_dir / _EMBED_CACHE_NAME
+            cache = self._load_embedding_cache(cache_path)
+            # 内容哈希 -> 特征：文件被重命名、复制或仅修改时间变化时仍可复用
+            cache_by_digest = {digest: embedding for _, _, embedding, digest in cache.values() if digest}
+            cache_dirty = False
+
+            # [图片文件, 文件状态, 特征, 内容哈希]；无法读取或未检测到人脸的图片特征为 None，
+            # 同样写入缓存，文件未变化时下次启动直接跳过，不再重复解码检测
+            entries: List[list] = []
+            pending: List[Tuple[int, np.ndarray]] = []  # (entries 下标, 对齐后的人脸)
+            failed = set()  # 提取特征出错的 entries 下标（不写入缓存，下次启动重试）
+            with os.scandir(known_faces_dir) as it:
+                image_entries = [e for e in it
+                                 if os.path.splitext(e.name)[1].lower() in IMAGE_EXTS
+                                 and e.is_file()]
+
+            for dir_entry in image_entries:
+                face_file = Path(dir_entry.path)
                 try:
-                    img = cv2.imread(str(face_file))
+                    stat = dir_entry.stat()
+                    cached = cache.get(face_file.name)
+                    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                        entries.append([face_file, stat, cached[2], cached[3]])
+                        if cached[2] is None:
+                            logger.debug(f"跳过无可用人脸的图片: {face_file}")
+                        continue
+
+                    cache_dirty = True
+                    digest = _file_digest(face_file)
+                    if digest in cache_by_digest:
+                        entries.append([face_file, stat, cache_by_digest[digest], digest])
+                        continue
+
+                    img = self._read_known_image(str(face_file))
                     if img is None:
                         logger.warning(f"无法读取图片: {face_file}")
+                        entries.append([face_file, stat, None, digest])
                         continue
 
-                    faces = self.model.get(img)
-                    if len(faces) == 0:
+                    aligned = self._align_first_face(img)
+                    if aligned is None:
                         logger.warning(f"未检测到人脸: {face_file}")
+                        entries.append([face_file, stat, None, digest])
                         continue
-
-                    # 使用第一张检测到的人脸
-                    face = faces[0]
-                    name = face_file.stem
-                    self.known_faces.append(KnownFace(
-                        name=name,
-                        embedding=face.embedding,
-                        image_path=str(face_file)
-                    ))
-                    logger.info(f"已加载人脸: {name}")
+                    pending.append((len(entries), aligned))
+                    entries.append([face_file, stat, None, digest])
 
                 except Exception as e:
                     logger.error(f"处理文件 {face_file} 出错: {e}")
 
+            for start in range(0, len(pending), _EMBED_BATCH_SIZE):
+                batch = pending[start:start + _EMBED_BATCH_SIZE]
+                try:
+                    embeddings = self._embed_aligned([aligned for _, aligned in batch])
+                except Exception as e:
+                    logger.error(f"批量提取人脸特征出错: {e}")
+                    failed.update(index for index, _ in batch)
+                    continue
+
+                for (index, _), embedding in zip(batch, embeddings):
+                    entries[index][2] = embedding
+
+            for face_file, _, embedding, _ in entries:
+                if embedding is None:
+                    continue
+                name = face_file.stem
+                self.known_faces.append(KnownFace(
+                    name=name,
+                    embedding=embedding,
+                    image_path=str(face_file)
+                ))
+                logger.info(f"已加载人脸: {name}")
+
+            # 有新增、变化或已删除的图片时才回写缓存
+            if cache_dirty or len(entries) != len(cache):
+                self._save_embedding_cache(
+                    cache_path, [entry for i, entry in enumerate(entries) if i not in failed])
+
+            self._rebuild_known_index()
             logger.info(f"共加载 {len(self.known_faces)} 张已知人脸")
 
         except Exception as e:
             logger.error(f"加载人脸库出错: {e}")
+            self._rebuild_known_index()
             raise
 
-    def detect_faces(self, image: np.ndarray) -> List[Face]:
-        """检测输入图像中的所有人脸"""
+    def _load_embedding_cache(self, cache_path: Path) -> dict:
+        """读取特征缓存，返回 {文件名: (mtime_ns, 文件大小, 特征或 None, 内容哈希)}；缓存缺失或损坏时返回空字典
+
+        特征为 None 表示该图片无法读取或未检测到人脸
+        """
+        if not cache_path.exists():
+            return {}
+        try:
+            with np.load(cache_path) as data:
+                files = data['files']
+                mtimes = data['mtimes']
+                sizes = data['sizes']
+                embeddings = data['embeddings'].astype(np.float32)
+                digests = data['digests'] if 'digests' in data.files else [''] * len(files)
+                valid = data['valid'] if 'valid' in data.files else [True] * len(files)
+            return {str(f): (int(m), int(s), e if ok else None, str(d))
+                    for f, m, s, e, d, ok in zip(files, mtimes, sizes, embeddings, digests, valid)}
+        except Exception as e:
+            logger.warning(f"特征缓存读取失败，将重新提取: {e}")
+            return {}
+
+    def _save_embedding_cache(self, cache_path: Path, entries: List[list]) -> None:
+        """写入特征缓存（float16 存储，先写临时文件再原子替换）；无人脸的图片以全零特征 + valid=False 记录"""
+        tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+        try:
+            dim = next((len(embedding) for _, _, embedding, _ in entries if embedding is not None), 0)
+            embeddings = np.zeros((len(entries), dim), dtype=np.float16)
+            for i, (_, _, embedding, _) in enumerate(entries):
+                if embedding is not None:
+                    embeddings[i] = embedding
+            with open(tmp_path, 'wb') as f:
+                np.savez(
+                    f,
+                    files=np.array([face_file.name for face_file, _, _, _ in entries], dtype=str),
+                    mtimes=np.array([stat.st_mtime_ns for _, stat, _, _ in entries], dtype=np.int64),
+                    sizes=np.array([stat.st_size for _, stat, _, _ in entries], dtype=np.int64),
+                    embeddings=embeddings,
+                    digests=np.array([digest for _, _, _, digest in entries], dtype=str),
+                    valid=np.array([embedding is not None for _, _, embedding, _ in entries], dtype=bool)
+                )
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"写入特征缓存失败: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def _read_known_image(self, path: str) -> Optional[np.ndarray]:
+        """读取人脸库图片：大图按 1/2 尺寸解码，缩小后不足检测输入尺寸时才完整解码"""
+        img = cv2.imread(path, cv2.IMREAD_REDUCED_COLOR_2)
+        if img is None or max(img.shape[:2]) < max(self.model.det_model.input_size):
+            img = cv2.imread(path)
+        return img
+
+    def _align_first_face(self, image: np.ndarray) -> Optional[np.ndarray]:
+        """检测置信度最高的人脸，并按关键点对齐裁剪为识别模型的输入尺寸"""
+        bboxes, kpss = self.model.det_model.detect(image, max_num=0, metric='default')
+        if bboxes.shape[0] == 0 or kpss is None:
+            return None
+        rec_model = self.model.models['recognition']
+        return face_align.norm_crop(image, landmark=kpss[0], image_size=rec_model.input_size[0])
+
+    def _embed_aligned(self, aligned_faces: List[np.ndarray]) -> np.ndarray:
+        """对已对齐的人脸做一次批量前向推理，返回 (N, D) 特征矩阵"""
+        return self.model.models['recognition'].get_feat(aligned_faces)
+
+    def _rebuild_known_index(self) -> None:
+        """根据 known_faces 重建归一化特征矩阵，识别时只需一次矩阵乘法"""
+        faces = list(self.known_faces)
+        if faces:
+            matrix = np.array([kf.embedding for kf in faces], dtype=np.float32)
+            row_norms = np.sqrt(np.einsum('ij,ij->i', matrix, matrix))
+            matrix /= row_norms[:, None] + 1e-12
+        else:
+            matrix = np.empty((0, 0), dtype=np.float32)
+        self._known_index = (faces, matrix)
+
+    @staticmethod
+    def _frame_hash(image: np.ndarray) -> bytes:
+        """计算画面的 64 位差值哈希（dHash）：缩小为 9x8 灰度图后比较左右相邻像素"""
+        small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return np.packbits(small[:, 1:] > small[:, :-1]).tobytes()
+
+    @staticmethod
+    def _frame_thumb(image: np.ndarray) -> np.ndarray:
+        """生成 32x32 灰度缩略图，用于按像素差判断画面是否变化"""
+        small = cv2.resize(image, (32, 32), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def _scene_unchanged(self, thumb: np.ndarray) -> bool:
+        """缩略图与上次检测时的缩略图平均每像素绝对差低于 motion_threshold 时视为画面未变化"""
+        if self._last_thumb is None:
+            return False
+        sad = cv2.norm(thumb, self._last_thumb, cv2.NORM_L1)
+        return sad < self.motion_threshold * thumb.size
+
+    def detect_faces(self, image: np.ndarray, reuse_if_unchanged: bool = False,
+                     raise_errors: bool = False) -> List[Face]:
+        """检测输入图像中的所有人脸
+
+        reuse_if_unchanged 为 True 且配置开启 skip_static_frames 时，若画面哈希与上次检测时
+        完全相同（设置了 motion_threshold 时改为缩略图像素差低于阈值），则直接复用上次的
+        检测结果；配置了 embedding_reuse_frames 时，
+        与上一帧人脸框重合的人脸沿用上一帧的特征（均仅用于连续视频帧）。
+
+        出错时默认返回空列表；raise_errors 为 True 时重新抛出异常，供调用方区分
+        "没有人脸"与"检测失败"（实时画面检测失败时不能当作无人脸直接显示）
+        """
         try:
-            faces = self.model.get(image)
+            frame_hash = None
+            thumb = None
+            if reuse_if_unchanged and self.skip_static_frames:
+                if self.motion_threshold > 0:
+                    thumb = self._frame_thumb(image)
+                    unchanged = self._scene_unchanged(thumb)
+                else:
+                    frame_hash = self._frame_hash(image)
+                    unchanged = frame_hash == self._last_frame_hash
+                if unchanged:
+                    return [replace(face, face_img=self._extract_face_image(image, face.bbox))
+                            for face in self._last_faces]
+
+            faces = self._run_models(image, reuse_embeddings=reuse_if_unchanged)
             results = []
 
             for face in faces:
@@ -118,40 +438,119 @@ class FaceDetector:
                     gender=self._get_gender(face),
                     face_img=face_img
                 ))
+
+            if frame_hash is not None or thumb is not None:
+                self._last_frame_hash = frame_hash
+                self._last_thumb = thumb
+                self._last_faces = results
             return results
         except Exception as e:
             logger.error(f"检测人脸出错: {e}")
+            self._last_frame_hash = None
+            self._last_thumb = None
+            self._embed_tracks = []
+            if raise_errors:
+                raise
+            return []
+
+    def _run_models(self, image: np.ndarray, reuse_embeddings: bool = False) -> List[InsightFace]:
+        """检测人脸，并将本帧所有人脸对齐后一次批量提取特征；年龄性别模型只对置信度和尺寸达标的人脸运行
+
+        小脸和低置信度人脸同样返回（仍需模糊处理），只是不做年龄性别分析
+        """
+        reuse_embeddings = reuse_embeddings and self.embedding_reuse_frames > 0
+        bboxes, kpss = self.model.det_model.detect(image, max_num=0, metric='default')
+        if bboxes.shape[0] == 0:
+            if reuse_embeddings:
+                self._embed_tracks = []
             return []
 
+        rec_model = self.model.models['recognition']
+        genderage_model = self.model.models.get('genderage') if self.analysis_enabled else None
+
+        faces = [InsightFace(
+            bbox=bboxes[i, 0:4],
+            kps=kpss[i] if kpss is not None else None,
+            det_score=bboxes[i, 4]
+        ) for i in range(bboxes.shape[0])]
+
+        if reuse_embeddings:
+            pending, ages = self._reuse_track_embeddings(faces)
+        else:
+            pending = range(len(faces))
+        aligned = [face_align.norm_crop(image, landmark=faces[i].kps, image_size=rec_model.input_size[0])
+                   for i in pending]
+        if aligned:
+            for i, embedding in zip(pending, self._embed_aligned(aligned)):
+                faces[i].embedding = embedding
+        if reuse_embeddings:
+            self._embed_tracks = [(face.bbox, face.embedding, age) for face, age in zip(faces, ages)]
+
+        if genderage_model is not None:
+            for face in faces:
+                if self._genderage_eligible(face):
+                    genderage_model.get(image, face)
+        return faces
+
+    def _reuse_track_embeddings(self, faces: List[InsightFace]) -> Tuple[List[int], List[int]]:
+        """为与上一帧人脸框高度重合的人脸沿用上一帧特征
+
+        返回仍需提取特征的人脸下标，以及每张人脸已连续沿用的帧数（新提取为 0）；
+        沿用满 embedding_reuse_frames 帧后重新提取一次，防止身份长期不被复核
+        """
+        ages = [0] * len(faces)
+        tracks = self._embed_tracks
+        if not tracks:
+            return list(range(len(faces))), ages
+
+        iou = _box_iou(np.array([face.bbox for face in faces], dtype=np.float32),
+                       np.array([track[0] for track in tracks], dtype=np.float32))
+        best = iou.argmax(axis=1)
+        pending = []
+        used = set()
+        for i, j in enumerate(best):
+            _, embedding, age = tracks[j]
+            if iou[i, j] >= _REUSE_IOU and age < self.embedding_reuse_frames and j not in used:
+                used.add(j)
+                faces[i].embedding = embedding
+                ages[i] = age + 1
+            else:
+                pending.append(i)
+        return pending, ages
+
+    def _genderage_eligible(self, face: InsightFace) -> bool:
+        """判断人脸是否值得运行年龄性别模型（过小或置信度过低的结果不可靠）"""
+        x1, y1, x2, y2 = face.bbox
+        return (face.det_score >= self.genderage_min_score
+                and min(x2 - x1, y2 - y1) >= self.genderage_min_face_size)
+
     def recognize_faces(self, faces: List[Face]) -> List[Tuple[Face, Optional[KnownFace], float]]:
         """将检测到的人脸与已知人脸库进行匹配"""
-        results = []
+        results: List[Tuple[Face, Optional[KnownFace], float]] = [(face, None, 0.0) for face in faces]
 
-        if not self.known_faces:
-            return [(face, None, 0.0) for face in faces]
+        known_faces, known_matrix = self._known_index
+        if not known_faces:
+            return results
 
         try:
-            # 提取已知人脸的所有 embedding 向量
-            known_embeddings = np.array([kf.embedding for kf in self.known_faces])
-
-            for face in faces:
-                if face.embedding is None or len(face.embedding) == 0:
-                    results.append((face, None, 0.0))
-                    continue
+            valid = [i for i, face in enumerate(faces)
+                     if face.embedding is not None and len(face.embedding) > 0]
+            if not valid:
+                return results
 
-                # 计算余弦相似度（Cosine Similarity）
-                similarities = np.dot(known_embeddings, face.embedding) / (
-                    np.linalg.norm(known_embeddings, axis=1) * np.linalg.norm(face.embedding)
-                )
+            # 计算余弦相似度（Cosine Similarity）：已知特征已预先归一化，
+            # 将全部待测特征堆叠为 (F, D) 并归一化后，一次矩阵乘法得到 (F, N) 相似度
+            probes = np.array([faces[i].embedding for i in valid], dtype=np.float32)
+            probes /= np.sqrt(np.einsum('ij,ij->i', probes, probes))[:, None] + 1e-12
+            similarities = probes @ known_matrix.T
 
-                max_idx = np.argmax(similarities)
-                max_similarity = similarities[max_idx]
+            max_idx = similarities.argmax(axis=1)
+            max_similarity = similarities[np.arange(len(valid)), max_idx]
 
-                # 判断是否超过识别阈值
-                if max_similarity > self.recognition_threshold:
-                    results.append((face, self.known_faces[max_idx], max_similarity))
-                else:
-                    results.append((face, None, max_similarity))
+            # 判断是否超过识别阈值
+            for i, idx, similarity in zip(valid, max_idx, max_similarity):
+                matched = known_faces[idx] if similarity > self.recognition_threshold else None
+                results[i] = (faces[i], matched, similarity)
 
         except Exception as e:
             logger.error(f"识别人脸出错: {e}")
@@ -160,7 +559,7 @@ class FaceDetector:
         return results
 
     def _extract_face_image(self, image: np.ndarray, bbox: np.ndarray) -> np.ndarray:
-        """根据边框提取人脸区域图像"""
+        """根据边框提取人脸区域图像（返回原图的视图，不复制像素）"""
         x1, y1, x2, y2 = map(int, bbox)
         x1 = max(0, x1)
         y1 = max(0, y1)
@@ -170,7 +569,7 @@ class FaceDetector:
         if x1 >= x2 or y1 >= y2:
             return np.array([])
 
-        return image[y1:y2, x1:x2].copy()
+        return image[y1:y2, x1:x2]
 
     def add_known_face(self, image: np.ndarray, name: str, save_dir: str) -> bool:
         """添加新的已知人脸到人脸库"""
@@ -197,6 +596,7 @@ class FaceDetector:
                 embedding=face.embedding,
                 image_path=str(face_path)
             ))
+            self._rebuild_known_index()
 
             logger.info(f"新的人脸已添加: {name}")
             return True
@@ -205,16 +605,54 @@ class FaceDetector:
             logger.error(f"添加人脸出错: {e}")
             return False
 
-    def _get_age(self, face) -> Optional[int]:
-        """提取年龄预测结果"""
-        if not self.analysis_enabled:
-            return None
-        return int(face.age) if hasattr(face, 'age') else None
+    def remove_known_face(self, image_path) -> bool:
+        """从人脸库中移除指定图片对应的人脸（只更新内存中的人脸库，不删除文件）"""
+        image_path = str(image_path)
+        remaining = [kf for kf in self.known_faces if kf.image_path != image_path]
+        if len(remaining) == len(self.known_faces):
+            return False
+        self.known_faces[:] = remaining
+        self._rebuild_known_index()
+        logger.info(f"人脸已移除: {Path(image_path).stem}")
+        return True
+
+    def replace_known_face(self, old_path, new_path, image: Optional[np.ndarray] = None) -> bool:
+        """更新人脸库中的一项：仅重命名时沿用原特征，传入 image 时只对该图重新提取特征"""
+        old_path, new_path = str(old_path), Path(new_path)
+        embedding = None
+        if image is not None:
+            aligned = self._align_first_face(image)
+            if aligned is None:
+                logger.warning("未检测到人脸，更新失败")
+                return False
+            embedding = self._embed_aligned([aligned])[0]
+
+        for i, kf in enumerate(self.known_faces):
+            if kf.image_path == old_path:
+                self.known_faces[i] = KnownFace(
+                    name=new_path.stem,
+                    embedding=kf.embedding if embedding is None else embedding,
+                    image_path=str(new_path)
+                )
+                break
+        else:
+            # 原图加载时未检测到人脸，库中没有对应项
+            if embedding is None:
+                return False
+            self.known_faces.append(KnownFace(name=new_path.stem, embedding=embedding, image_path=str(new_path)))
 
-    def _get_gender(self, face) -> Optional[str]:
-        """提取性别预测结果"""
-        if not self.analysis_enabled:
+        self._rebuild_known_index()
+        logger.info(f"人脸已更新: {new_path.stem}")
+        return True
+
+    def _get_age(self, face: InsightFace) -> Optional[int]:
+        """提取年龄预测结果（未运行年龄性别模型时为 None）"""
+        if not self.analysis_enabled or face.age is None:
             return None
-        if not hasattr(face, 'sex') or face.sex is None:
+        return int(face.age)
+
+    def _get_gender(self, face: InsightFace) -> Optional[str]:
+        """提取性别预测结果（InsightFace 中 gender 为 1 表示男性）"""
+        if not self.analysis_enabled or face.gender is None:
             return None
-        return 'Female' if np.argmax(face.sex) == 1 else 'Male'
+        return 'Male' if face.gender == 1 else 'Female'
@@ -1,9 +1,27 @@
 import numpy as np
+import yaml
+from typing import Optional
 from loguru import logger
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # 未编译 libyaml 时退回纯 Python 解析器
+    from yaml import SafeLoader as _YamlLoader
 
-def numpy_to_pixmap(image: np.ndarray) -> "QPixmap":
-    """将 numpy 图像数据转换为 QPixmap（用于 PyQt 显示）"""
+
+# 人脸库支持的图片扩展名（人脸库加载与人脸管理界面共用；元组可直接用于 str.endswith）
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png')
+
+
+def load_yaml(path) -> dict:
+    """读取 YAML 配置文件（优先使用 libyaml 加速的 CSafeLoader），空文件返回空字典"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
+
+def numpy_to_pixmap(image: np.ndarray, target_w: Optional[int] = None,
+                    target_h: Optional[int] = None) -> "QPixmap":
+    """将 numpy 图像数据转换为 QPixmap（用于 PyQt 显示）；指定目标尺寸时按比例平滑缩放"""
     try:
         from PyQt5.QtGui import QImage, QPixmap
         from PyQt5.QtCore import Qt
@@ -11,19 +29,41 @@ def numpy_to_pixmap(image: np.ndarray) -> "QPixmap":
         if image is None:
             return QPixmap()
 
+        # QImage 直接引用 numpy 内存，按 strides[0] 作为行跨度解析；
+        # 只要求每行内像素连续，行间有填充的切片（如 buf[:h, :w]）无需复制
+        if image.itemsize != 1 or image.strides[-1] != 1 or \
+                (image.ndim == 3 and image.strides[1] != image.shape[2]) or \
+                image.strides[0] < 0:
+            image = np.ascontiguousarray(image)
+        bytes_per_line = image.strides[0]
+        # 以地址传入：切片视图不满足缓冲区协议的连续性检查，地址方式两者通用
+        ptr = image.ctypes.data
         if len(image.shape) == 2:  # 灰度图
             h, w = image.shape
-            qimg = QImage(image.data, w, h, w, QImage.Format_Grayscale8)
+            qimg = QImage(ptr, w, h, bytes_per_line, QImage.Format_Grayscale8)
         else:  # 彩色图（BGR 格式）
             h, w, ch = image.shape
-            bytes_per_line = ch * w
-            qimg = QImage(image.data, w, h, bytes_per_line, QImage.Format_BGR888)
+            qimg = QImage(ptr, w, h, bytes_per_line, QImage.Format_BGR888)
 
-        # 转换为 QPixmap，并保持比例缩放
-        return QPixmap.fromImage(qimg).scaled(
-            w, h, Qt.KeepAspectRatio, Qt.SmoothTransformation
+        # fromImage 会复制像素，返回后 QPixmap 不再依赖 numpy 内存
+        pixmap = QPixmap.fromImage(qimg)
+        if target_w is None and target_h is None:
+            return pixmap
+        return scale_pixmap(
+            pixmap,
+            target_w if target_w is not None else w,
+            target_h if target_h is not None else h
         )
 
     except Exception as e:
         logger.error(f"numpy 转 QPixmap 出错: {e}")
         return QPixmap()
+
+
+def scale_pixmap(pixmap: "QPixmap", target_w: int, target_h: int) -> "QPixmap":
+    """按比例缩放 QPixmap：源图超过目标 2 倍时先快速缩到 2 倍以内，再做一次平滑缩放"""
+    from PyQt5.QtCore import Qt
+
+    if pixmap.width() > 2 * target_w and pixmap.height() > 2 * target_h:
+        pixmap = pixmap.scaled(2 * target_w, 2 * target_h, Qt.KeepAspectRatio, Qt.FastTransformation)
+    return pixmap.scaled(target_w, target_h, Qt.KeepAspectRatio, Qt.SmoothTransformation)
@@ -15,13 +15,13 @@
 """
 
 import sys
-import yaml
 from pathlib import Path
 from loguru import logger
 from PyQt5.QtWidgets import QApplication, QSplashScreen
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtGui import QPixmap, QPixmapCache
 from PyQt5.QtCore import Qt, QTimer
 
+from core.utils import load_yaml
 from ui.main_window import MainWindow
 
 def load_config(config_path: str) -> dict:
@@ -30,8 +30,7 @@ def load_config(config_path: str) -> dict:
     - 自动创建人脸库、日志目录
     """
     try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        config = load_yaml(config_path)
 
         Path(config['app']['known_faces_dir']).mkdir(parents=True, exist_ok=True)
         Path(config['app']['log_dir']).mkdir(parents=True, exist_ok=True)
@@ -98,6 +97,7 @@ def main():
         setup_logging(config['app']['log_dir'])
 
         app = QApplication(sys.argv)
+        QPixmapCache.setCacheLimit(64 * 1024)  # 图片预览缓存上限 64 MB（单位 KB）
         splash = show_splash_screen(config)
         splash.show()
         app.processEvents()
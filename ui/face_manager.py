@@ -2,12 +2,54 @@
 
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QPushButton,
                              QLabel, QFileDialog, QMessageBox, QLineEdit)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QObject, QRunnable, QSize, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QImageIOHandler, QImageReader, QPixmap, QPixmapCache
 from loguru import logger
 import cv2
+import os
 from pathlib import Path
 
-from core.utils import numpy_to_pixmap
+from core.utils import IMAGE_EXTS, numpy_to_pixmap
+
+
+# 已写入 QPixmapCache 的预览键：图片路径 -> {缓存键}（用于删除/修改人脸时主动清除）
+_preview_keys = {}
+
+# 连续切换选中项时，停止切换多久后才开始解码预览（毫秒）
+_PREVIEW_DEBOUNCE_MS = 120
+
+
+class _ImageLoaderSignals(QObject):
+    """ImageLoader 的信号载体（QRunnable 本身不是 QObject，无法定义信号）"""
+    loaded = pyqtSignal(int, str, QImage)  # (请求序号, 缓存键, 缩放后的图像)
+
+
+class ImageLoader(QRunnable):
+    """在线程池中解码并缩放预览图；QImage 可跨线程传递，QPixmap 需回到界面线程创建"""
+
+    def __init__(self, path: Path, size: QSize, token: int, key: str):
+        super().__init__()
+        self.path = path
+        self.size = size
+        self.token = token
+        self.key = key
+        self.signals = _ImageLoaderSignals()
+
+    def run(self):
+        # 解码时直接缩放到预览尺寸（JPEG 可在 DCT 阶段按 1/2、1/4、1/8 缩小），不必先解出原图
+        reader = QImageReader(str(self.path))
+        # 与 cv2.imread 一致按 EXIF 方向摆正（手机竖拍照片）；缩放尺寸作用于旋转前的图像，
+        # 旋转 90° 的图片需按宽高互换的预览框计算
+        reader.setAutoTransform(True)
+        scaled_size = reader.size()
+        if scaled_size.isValid():
+            rotated = bool(reader.transformation() & QImageIOHandler.TransformationRotate90)
+            scaled_size.scale(self.size.transposed() if rotated else self.size, Qt.KeepAspectRatio)
+            reader.setScaledSize(scaled_size)
+        image = reader.read()
+        if not scaled_size.isValid() and not image.isNull():
+            image = image.scaled(self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        self.signals.loaded.emit(self.token, self.key, image)
 
 
 class FaceManagerDialog(QDialog):
@@ -27,6 +69,14 @@ class FaceManagerDialog(QDialog):
         self.face_detector = face_detector
         self.known_faces_dir = known_faces_dir
         self.current_image = None  # 当前导入或显示的图片
+        self._current_image_path = None  # 当前显示的人脸库图片路径（需要时才解码为 current_image）
+        self._load_token = 0  # 预览加载请求序号，用于丢弃过期的后台加载结果
+        self._pending_preview = None  # 等待防抖结束后加载的 (图片路径, 缓存键)
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.timeout.connect(self._start_preview_load)
+        self._face_paths = {}  # 人脸名称 -> 图片路径（由 load_face_list 建立，增删改时同步维护）
+        self.dirty = False  # 本次打开期间人脸库文件是否被修改（关闭后由主窗口决定是否重新加载）
 
         self.setWindowTitle("人脸管理")          # 窗口标题
         self.setGeometry(200, 200, 800, 600)  # 窗口大小
@@ -92,18 +142,29 @@ class FaceManagerDialog(QDialog):
     def load_face_list(self):
         """加载已知人脸目录中的图片文件名到列表中"""
         self.face_list.clear()
+        self._face_paths.clear()
         known_faces_dir = Path(self.known_faces_dir)
 
         if not known_faces_dir.exists():
             logger.warning(f"已知人脸目录不存在: {known_faces_dir}")
             return
 
-        for face_file in known_faces_dir.glob('*.*'):
-            if face_file.suffix.lower() in ['.jpg', '.jpeg', '.png']:
-                self.face_list.addItem(face_file.stem)
+        with os.scandir(known_faces_dir) as it:
+            for entry in it:
+                if entry.name.lower().endswith(IMAGE_EXTS) and entry.is_file():
+                    self._face_paths[os.path.splitext(entry.name)[0]] = Path(entry.path)
+
+        # 一次性批量添加，避免逐项触发信号与重新布局
+        self.face_list.setUpdatesEnabled(False)
+        try:
+            self.face_list.addItems(list(self._face_paths))
+        finally:
+            self.face_list.setUpdatesEnabled(True)
 
     def on_face_selected(self, current, previous):
-        """当选择列表中的人脸时，加载并显示对应图像"""
+        """当选择列表中的人脸时，加载并显示对应图像（未缓存时在后台线程解码）"""
+        self._load_token += 1
+        self._preview_timer.stop()
         if current is None:
             self.face_preview.clear()
             self.name_input.clear()
@@ -112,34 +173,68 @@ class FaceManagerDialog(QDialog):
         face_name = current.text()
         self.name_input.setText(face_name)
 
-        # 拼接文件路径（支持多种扩展名）
-        face_path = Path(self.known_faces_dir) / f"{face_name}{self.get_face_extension(face_name)}"
-        if not face_path.exists():
-            QMessageBox.warning(self, "错误", f"文件未找到: {face_path}")
+        face_path = self._face_paths.get(face_name)
+        try:
+            mtime_ns = face_path.stat().st_mtime_ns
+        except (AttributeError, OSError):
+            QMessageBox.warning(self, "错误", f"文件未找到: {face_path or face_name}")
             return
 
         try:
-            image = cv2.imread(str(face_path))
-            if image is None:
-                raise ValueError("无法读取图像")
+            # 预览缓存使用全局 QPixmapCache（按字节数限额、自动淘汰），关闭窗口后再次打开仍可命中
+            key = f"face_preview:{face_path}:{mtime_ns}:{self.face_preview.width()}x{self.face_preview.height()}"
+            self.current_image = None
+            self._current_image_path = face_path
+
+            pixmap = QPixmapCache.find(key)
+            if pixmap is not None and not pixmap.isNull():
+                self.face_preview.setPixmap(pixmap)
+                return
 
-            self.current_image = image
-            pixmap = numpy_to_pixmap(image)
-            self.face_preview.setPixmap(pixmap.scaled(
-                self.face_preview.width(), self.face_preview.height(),
-                Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            # 按住方向键快速切换时只解码最后停留的那一项
+            self.face_preview.clear()
+            self._pending_preview = (face_path, key)
+            self._preview_timer.start(_PREVIEW_DEBOUNCE_MS)
 
         except Exception as e:
             QMessageBox.critical(self, "错误", f"加载图像失败: {str(e)}")
             logger.error(f"加载人脸图像错误: {e}")
 
-    def get_face_extension(self, face_name: str) -> str:
-        """查找指定人脸文件的扩展名"""
-        known_faces_dir = Path(self.known_faces_dir)
-        for ext in ['.jpg', '.jpeg', '.png']:
-            if (known_faces_dir / f"{face_name}{ext}").exists():
-                return ext
-        return ''
+    def _start_preview_load(self):
+        """防抖结束：提交后台预览加载（仅用于显示，直接由 Qt 解码，省去 numpy 数组拷贝）"""
+        if self._pending_preview is None:
+            return
+        face_path, key = self._pending_preview
+        self._pending_preview = None
+        _preview_keys.setdefault(str(face_path), set()).add(key)
+        loader = ImageLoader(face_path, self.face_preview.size(), self._load_token, key)
+        loader.signals.loaded.connect(self._on_preview_loaded)
+        QThreadPool.globalInstance().start(loader)
+
+    def _on_preview_loaded(self, token: int, key: str, image: QImage):
+        """后台预览加载完成：写入缓存，仅当仍是最新请求时才显示"""
+        is_current = token == self._load_token
+        if image.isNull():
+            if is_current:
+                QMessageBox.critical(self, "错误", "加载图像失败: 无法读取图像")
+                logger.error(f"加载人脸图像错误: 无法读取 {key}")
+            return
+
+        pixmap = QPixmap.fromImage(image)
+        QPixmapCache.insert(key, pixmap)
+        if is_current:
+            self.face_preview.setPixmap(pixmap)
+
+    def _get_current_image(self):
+        """返回当前图片的 numpy 数组；从人脸库选中的图片在此时才用 OpenCV 解码"""
+        if self.current_image is None and self._current_image_path is not None:
+            self.current_image = cv2.imread(str(self._current_image_path))
+        return self.current_image
+
+    def _invalidate_preview(self, face_path) -> None:
+        """移除指定人脸图片的预览缓存"""
+        for key in _preview_keys.pop(str(face_path), ()):
+            QPixmapCache.remove(key)
 
     def add_face(self):
         """添加新的人脸图片并更新人脸识别器"""
@@ -148,23 +243,27 @@ class FaceManagerDialog(QDialog):
             QMessageBox.warning(self, "错误", "请先输入人脸名称")
             return
 
-        if self.current_image is None:
+        image = self._get_current_image()
+        if image is None:
             QMessageBox.warning(self, "错误", "请先导入或选择一张图片")
             return
 
         # 检查是否已存在同名人脸
-        existing_files = list(Path(self.known_faces_dir).glob(f"{name}.*"))
-        if existing_files:
+        if name in self._face_paths:
             QMessageBox.warning(self, "错误", f"'{name}' 已存在")
             return
 
         # 调用检测器添加
         success = self.face_detector.add_known_face(
-            self.current_image, name, self.known_faces_dir)
+            image, name, self.known_faces_dir)
 
         if success:
+            # add_known_face 会把新人脸追加到末尾，文件名由其决定
+            face_path = Path(self.face_detector.known_faces[-1].image_path)
+            self._face_paths[face_path.stem] = face_path
+            self.face_list.addItem(face_path.stem)
+            self.dirty = True
             QMessageBox.information(self, "成功", f"人脸 '{name}' 添加成功")
-            self.load_face_list()
         else:
             QMessageBox.warning(self, "错误", "添加失败")
 
@@ -182,16 +281,24 @@ class FaceManagerDialog(QDialog):
             QMessageBox.warning(self, "错误", "请输入人脸名称")
             return
 
-        if self.current_image is None:
+        if self.current_image is None and self._current_image_path is None:
             QMessageBox.warning(self, "错误", "请导入或选择一张图片")
             return
+        # 图片就是选中的人脸库文件本身（未导入新图）时无需解码再写回
+        image_unchanged = self.current_image is None
+
+        old_path = self._face_paths.get(old_name)
+        if old_path is None:
+            QMessageBox.warning(self, "错误", f"文件未找到: {old_name}")
+            return
+        current_path = old_path
+        self._invalidate_preview(old_path)
 
         # 如果名称变化则重命名文件
         if old_name != new_name:
-            old_path = Path(self.known_faces_dir) / f"{old_name}{self.get_face_extension(old_name)}"
             new_path = Path(self.known_faces_dir) / f"{new_name}{old_path.suffix}"
 
-            if new_path.exists():
+            if new_name in self._face_paths or new_path.exists():
                 QMessageBox.warning(self, "错误", f"'{new_name}' 已存在")
                 return
 
@@ -200,17 +307,27 @@ class FaceManagerDialog(QDialog):
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"重命名失败: {str(e)}")
                 return
+            self.dirty = True
+
+            del self._face_paths[old_name]
+            self._face_paths[new_name] = new_path
+            current_item.setText(new_name)
+            if self._current_image_path == old_path:
+                self._current_image_path = new_path
+            current_path = new_path
 
         # 更新图片
         try:
-            current_path = Path(self.known_faces_dir) / f"{new_name}{self.get_face_extension(new_name)}"
-            cv2.imwrite(str(current_path), self.current_image)
-
-            # 重新加载识别器中的人脸库
-            self.face_detector.load_known_faces(self.known_faces_dir)
-
-            QMessageBox.information(self, "成功", "人脸更新成功")
-            self.load_face_list()
+            if not image_unchanged:
+                cv2.imwrite(str(current_path), self.current_image)
+                self.dirty = True
+
+            # 只更新识别器中的这一项，不重新加载整个人脸库
+            if self.face_detector.replace_known_face(
+                    old_path, current_path, None if image_unchanged else self.current_image):
+                QMessageBox.information(self, "成功", "人脸更新成功")
+            else:
+                QMessageBox.warning(self, "错误", "图片中未检测到人脸，识别库未更新")
         except Exception as e:
             QMessageBox.critical(self, "错误", f"更新失败: {str(e)}")
 
@@ -231,11 +348,16 @@ class FaceManagerDialog(QDialog):
         if reply == QMessageBox.No:
             return
 
-        face_path = Path(self.known_faces_dir) / f"{name}{self.get_face_extension(name)}"
+        face_path = self._face_paths.get(name)
+        self._invalidate_preview(face_path)
         try:
+            if face_path is None:
+                raise FileNotFoundError(name)
             face_path.unlink()
-            self.face_detector.load_known_faces(self.known_faces_dir)
-            self.load_face_list()
+            self.dirty = True
+            del self._face_paths[name]
+            self.face_list.takeItem(self.face_list.row(current_item))
+            self.face_detector.remove_known_face(face_path)
             QMessageBox.information(self, "成功", "删除成功")
         except Exception as e:
             QMessageBox.critical(self, "错误", f"删除失败: {str(e)}")
@@ -254,11 +376,12 @@ class FaceManagerDialog(QDialog):
             if image is None:
                 raise ValueError("无法读取图像")
 
+            self._load_token += 1  # 丢弃尚未完成的人脸库预览加载
+            self._preview_timer.stop()
             self.current_image = image
-            pixmap = numpy_to_pixmap(image)
-            self.face_preview.setPixmap(pixmap.scaled(
-                self.face_preview.width(), self.face_preview.height(),
-                Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            self._current_image_path = None
+            self.face_preview.setPixmap(numpy_to_pixmap(
+                image, self.face_preview.width(), self.face_preview.height()))
 
             # 默认使用文件名作为建议名称
             suggested_name = Path(file_path).stem
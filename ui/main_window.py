@@ -1,13 +1,15 @@
 # -*- coding: utf-8 -*-
 
+import math
 import sys
-from typing import Optional, Tuple
+import time
+from typing import List, Optional, Tuple
 
 import cv2
 import numpy as np
 from loguru import logger
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QIcon, QPainter, QPen
 from PyQt5.QtWidgets import (
     QMainWindow,
     QApplication,
@@ -22,7 +24,7 @@ from PyQt5.QtWidgets import (
 )
 
 # 导入核心模块
-from core.face_detection import FaceDetector
+from core.face_detection import FaceDetector, _round_det_size
 from core.camera_manager import CameraManager
 from core.utils import numpy_to_pixmap
 
@@ -30,6 +32,171 @@ from core.utils import numpy_to_pixmap
 from .face_manager import FaceManagerDialog
 
 
+# 系统状态面板文本模板（静态部分只构建一次，定时刷新时只填入动态数值）
+_STATUS_TEMPLATE = (
+    "=== 摄像头状态 ===\n"
+    "{camera}\n"
+    "\n=== 人脸库 ===\n"
+    "已知人脸数量：{known}\n"
+    "\n=== 实时统计 ===\n"
+    "当前检测到的人脸数量：{faces}\n"
+    "当前被模糊的人脸数量：{blurred}\n"
+    "当前模糊范围倍率：{blur:.2f}x"
+)
+
+# 画面上屏的最小间隔（纳秒），约等于 60Hz 显示器的刷新周期
+_DISPLAY_INTERVAL_NS = 16_000_000
+
+# 已知人脸标注的颜色
+_KNOWN_FACE_COLOR = QColor(0, 255, 0)
+
+# 滑块停止拖动多久后才让参数生效（毫秒）
+_SLIDER_COMMIT_DELAY_MS = 50
+
+# 马赛克在人脸长边方向的默认色块数（模糊倍率 1.0 时）
+_PIXELATE_CELLS = 8
+
+
+# 主窗口样式表（模块加载时构建一次）
+_STYLESHEET = """
+    QMainWindow {
+        background-color: #0f172a;
+        color: #e2e8f0;
+    }
+    QLabel {
+        color: #e2e8f0;
+    }
+    QLabel#sectionTitle {
+        font-size: 20px;
+        font-weight: 600;
+        padding: 8px 0;
+        color: #93c5fd;
+    }
+    QLabel#cameraFeed {
+        background-color: #1e293b;
+        border-radius: 12px;
+        border: 2px solid #1d4ed8;
+    }
+    QTabWidget::pane {
+        border: 1px solid #1d4ed8;
+        border-radius: 10px;
+        background-color: #111c34;
+    }
+    QTabBar::tab {
+        padding: 10px 24px;
+        background-color: transparent;
+        color: #cbd5f5;
+        border-bottom: 2px solid transparent;
+    }
+    QTabBar::tab:selected {
+        background-color: #1e3a8a;
+        border-top-left-radius: 8px;
+        border-top-right-radius: 8px;
+        color: #ffffff;
+        border-bottom: 2px solid #60a5fa;
+    }
+    QPushButton {
+        background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:0, y2:1, stop:0 #2563eb, stop:1 #1e40af);
+        border: 2px solid #60a5fa;
+        border-radius: 10px;
+        padding: 10px 20px;
+        color: #ffffff;
+        font-weight: 600;
+    }
+    QPushButton:hover {
+        background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:0, y2:1, stop:0 #3b82f6, stop:1 #1d4ed8);
+        border: 2px solid #93c5fd;
+    }
+    QPushButton:pressed {
+        background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:0, y2:1, stop:0 #1d4ed8, stop:1 #1e3a8a);
+        border: 2px solid #3b82f6;
+        padding-top: 12px;
+        padding-bottom: 8px;
+    }
+    QGroupBox {
+        border: 1px solid #1d4ed8;
+        border-radius: 12px;
+        margin-top: 12px;
+        padding: 16px;
+        font-weight: 600;
+        background-color: rgba(30, 64, 175, 0.35);
+    }
+    QGroupBox::title {
+        subcontrol-origin: margin;
+        subcontrol-position: top left;
+        padding: 0 10px;
+        color: #bfdbfe;
+    }
+"""
+
+
+def _create_tracker():
+    """创建 MOSSE 跟踪器（OpenCV 4.5.1 起位于 cv2.legacy，需要 opencv-contrib）"""
+    legacy = getattr(cv2, 'legacy', None)
+    if legacy is not None and hasattr(legacy, 'TrackerMOSSE_create'):
+        return legacy.TrackerMOSSE_create()
+    return cv2.TrackerMOSSE_create()
+
+
+def _tracker_supported() -> bool:
+    """检查当前 OpenCV 是否提供 MOSSE 跟踪器（未安装 opencv-contrib 时不可用）"""
+    try:
+        _create_tracker()
+        return True
+    except Exception:
+        return False
+
+
+class _FrameJobSignals(QObject):
+    """后台处理任务的信号载体（QRunnable 本身不能发射信号）"""
+    finished = pyqtSignal(object, object, int, int)  # (处理后的帧, 已知人脸标注, 人脸数, 模糊数)
+
+
+class _FrameJob(QRunnable):
+    """在线程池中执行一帧的检测、识别与模糊，结果通过信号交回 GUI 线程显示"""
+
+    def __init__(self, window: "MainWindow", frame: np.ndarray):
+        super().__init__()
+        self.window = window
+        self.frame = frame
+        self.signals = _FrameJobSignals()
+
+    def run(self):
+        try:
+            processed_frame, annotations, face_count, blurred_count = self.window.process_frame(self.frame)
+        except Exception as e:
+            # 处理失败的帧不能显示：未经模糊的原始画面会泄露陌生人脸
+            logger.error(f"处理帧错误: {e}")
+            processed_frame, annotations, face_count, blurred_count = None, [], 0, 0
+        self.signals.finished.emit(processed_frame, annotations, face_count, blurred_count)
+
+
+class _KnownFacesSignals(QObject):
+    """人脸库后台加载任务的信号载体"""
+    finished = pyqtSignal(bool)  # 是否加载成功
+
+
+class _KnownFacesLoader(QRunnable):
+    """在后台线程加载已知人脸库，避免首次显示窗口前阻塞 GUI 线程"""
+
+    def __init__(self, face_detector: FaceDetector, known_faces_dir: str):
+        super().__init__()
+        self.face_detector = face_detector
+        self.known_faces_dir = known_faces_dir
+        self.signals = _KnownFacesSignals()
+
+    def run(self):
+        # 异常不能逃出 QRunnable.run（PyQt5 会直接终止程序），且无论成败都要通知 GUI 线程
+        success = False
+        try:
+            self.face_detector.load_known_faces(self.known_faces_dir)
+            success = True
+        except Exception as e:
+            logger.error(f"后台加载人脸库失败: {e}")
+        finally:
+            self.signals.finished.emit(success)
+
+
 class MainWindow(QMainWindow):
     """
     系统主窗口（MainWindow）
@@ -38,6 +205,9 @@ class MainWindow(QMainWindow):
     已注册人脸将保持清晰，陌生人脸会被自动模糊处理。
     """
 
+    # 采集线程有新帧时发出（跨线程发射，自动排队到界面线程处理）
+    frame_ready = pyqtSignal()
+
     def __init__(self, config):
         """初始化主界面及所有核心组件"""
         super().__init__()
@@ -48,7 +218,11 @@ class MainWindow(QMainWindow):
 
         # --- 初始化核心组件 ---
         self.face_detector = FaceDetector(config)                         # 人脸检测与识别模块
-        self.camera_manager = CameraManager('config/camera_config.yaml')  # 摄像头管理模块
+        self.camera_manager = CameraManager('config/camera_config.yaml', self.frame_ready.emit)  # 摄像头管理模块
+
+        # 状态面板中的摄像头名称前缀（摄像头配置运行期间不变）
+        camera = self.camera_manager.camera
+        self._status_camera_prefix = f"{camera.name}：" if camera else None
 
         # 实时统计信息
         self.current_face_count = 0
@@ -60,19 +234,58 @@ class MainWindow(QMainWindow):
         if self.blur_strength_factor <= 0:
             self.blur_strength_factor = 1.0
 
-        # 加载已知人脸库
-        self.face_detector.load_known_faces(config['app']['known_faces_dir'])
+        # 模糊方式：pixelate（马赛克，开销与人脸大小近似线性）或 gaussian（高斯模糊）
+        self.blur_mode = processing_cfg.get('blur_mode', 'pixelate')
+
+        # 检测间隔：每 N 帧做一次完整检测识别，中间帧用 MOSSE 跟踪器沿用上次的身份（1 为逐帧检测）
+        self.detection_interval = max(1, int(processing_cfg.get('detection_interval', 1)))
+        # 启动时检查一次跟踪器是否可用，不可用时固定为逐帧检测（避免每次检测都创建失败刷屏日志）
+        self._tracking_supported = _tracker_supported()
+        if not self._tracking_supported:
+            if self.detection_interval > 1:
+                logger.warning("当前 OpenCV 不支持 MOSSE 跟踪器（需要 opencv-contrib），检测间隔固定为 1")
+            self.detection_interval = 1
+        # 跟踪状态只由后台处理线程读写；GUI 线程需要清空跟踪器时只递增 _tracks_generation，
+        # 由处理线程在下一帧开始时发现并清空，避免两个线程同时改写 _tracks
+        self._tracks: List[tuple] = []  # [(跟踪器, 已知人脸或 None, 置信度)]
+        self._frames_since_detection = 0
+        self._tracks_generation = 0
+        self._applied_tracks_generation = 0
+        self._last_shown_ns = 0  # 上一次画面上屏的时间
+        self._display_buf: Optional[np.ndarray] = None  # 复用的缩放输出缓冲区
+        # 画面显示区域尺寸（由 GUI 线程在显示时更新），后台处理据此先缩小画面再模糊与标注
+        self._display_size: Optional[Tuple[int, int]] = None
+        self._process_buf: Optional[np.ndarray] = None  # 后台缩小画面复用的缓冲区
+        # 已知人脸标注字体（QFont 需在 QApplication 创建后构造）
+        self._known_face_font = QFont()
+        self._known_face_font.setPixelSize(16)
+        self._known_face_font.setBold(True)
+
+        # 人脸库与摄像头在窗口首次显示后再加载/启动（见 showEvent）
+        self._deferred_started = False
+        self._known_faces_ready = False
+
+        # 滑块拖动时只刷新数值显示，停止拖动后再统一写入配置与检测器
+        self._pending_slider_values = {}
+        self._slider_commit_timer = QTimer(self)
+        self._slider_commit_timer.setSingleShot(True)
+        self._slider_commit_timer.timeout.connect(self._commit_slider_state)
 
         # --- 初始化 UI ---
         self.init_ui()
 
-        # 启动摄像头线程
-        self.camera_manager.start_camera()
+        # 有新帧时才处理并刷新画面（由采集线程驱动，不再固定周期轮询）
+        # 帧处理放到后台线程执行，GUI 线程只负责显示；同一时刻最多一帧在处理，
+        # 处理期间到达的新帧留在采集槽中被更新的帧覆盖，处理完后直接取最新帧
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._job_running = False
+        self.frame_ready.connect(self.update)
 
-        # 启动定时更新器（刷新画面）
+        # 系统状态面板低频刷新
         self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.update)
-        self.update_timer.start(30)  # 约 30 FPS
+        self.update_timer.timeout.connect(self.update_status)
+        self.update_timer.start(500)
 
     # ------------------------------
     # 初始化与 UI 构建部分
@@ -192,6 +405,39 @@ class MainWindow(QMainWindow):
         self.update_blur_strength(self.blur_slider.value())
         camera_layout.addLayout(blur_layout)
 
+        det_size_layout = QHBoxLayout()
+        det_size_label = QLabel("检测尺寸：")
+        det_size_layout.addWidget(det_size_label)
+
+        self.det_size_slider = QSlider(Qt.Horizontal)
+        self.det_size_slider.setRange(160, 1280)
+        self.det_size_slider.setSingleStep(32)
+        self.det_size_slider.setPageStep(64)
+        self.det_size_slider.setValue(self.face_detector.det_size)
+        self.det_size_slider.valueChanged.connect(self.update_det_size)
+        det_size_layout.addWidget(self.det_size_slider)
+
+        self.det_size_value = QLabel(f"{self.face_detector.det_size}px")
+        det_size_layout.addWidget(self.det_size_value)
+        camera_layout.addLayout(det_size_layout)
+
+        interval_layout = QHBoxLayout()
+        interval_label = QLabel("检测间隔：")
+        interval_layout.addWidget(interval_label)
+
+        self.interval_slider = QSlider(Qt.Horizontal)
+        self.interval_slider.setRange(1, 10)
+        self.interval_slider.setValue(min(self.detection_interval, self.interval_slider.maximum()))
+        if not self._tracking_supported:
+            self.interval_slider.setEnabled(False)
+            self.interval_slider.setToolTip("需要 opencv-contrib 提供的 MOSSE 跟踪器")
+        self.interval_slider.valueChanged.connect(self.update_detection_interval)
+        interval_layout.addWidget(self.interval_slider)
+
+        self.interval_value = QLabel(f"每 {self.interval_slider.value()} 帧")
+        interval_layout.addWidget(self.interval_value)
+        camera_layout.addLayout(interval_layout)
+
         layout.addWidget(camera_group)
 
         status_group = QGroupBox("系统状态")
@@ -205,11 +451,42 @@ class MainWindow(QMainWindow):
     # ------------------------------
     # 菜单动作
     # ------------------------------
+    def showEvent(self, event):
+        """首次显示窗口后再启动摄像头并在后台加载人脸库，让界面先完成绘制"""
+        super().showEvent(event)
+        if not self._deferred_started:
+            self._deferred_started = True
+            QTimer.singleShot(0, self._start_deferred)
+
+    def _start_deferred(self):
+        """启动摄像头线程，并在后台加载已知人脸库
+
+        人脸库加载完成前识别库为空，所有人脸都按陌生人脸模糊，不会泄露画面
+        """
+        self.camera_manager.start_camera()
+        loader = _KnownFacesLoader(self.face_detector, self.config['app']['known_faces_dir'])
+        loader.signals.finished.connect(self._on_known_faces_loaded)
+        QThreadPool.globalInstance().start(loader)
+
+    def _on_known_faces_loaded(self, success: bool):
+        """人脸库加载结束（GUI 线程）：失败时同样解除人脸管理的锁定，便于在界面中修复人脸库"""
+        self._known_faces_ready = True
+        if success:
+            logger.info("已知人脸库加载完成")
+        else:
+            self.status_bar.showMessage("人脸库加载失败，所有人脸将按陌生人脸模糊", 5000)
+
     def open_face_manager(self):
         """打开人脸管理窗口"""
+        if not self._known_faces_ready:
+            # 后台加载期间修改人脸库会与加载过程冲突
+            self.status_bar.showMessage("人脸库加载中，请稍后再打开人脸管理", 3000)
+            return
         dialog = FaceManagerDialog(self.face_detector, self.config['app']['known_faces_dir'])
         dialog.exec_()
-        self.face_detector.load_known_faces(self.config['app']['known_faces_dir'])
+        # 对话框已增量更新识别器；仅在人脸库文件有改动时重新加载，以校准并刷新嵌入缓存
+        if dialog.dirty:
+            self.face_detector.load_known_faces(self.config['app']['known_faces_dir'])
 
     def toggle_fullscreen(self):
         """切换全屏模式"""
@@ -223,6 +500,8 @@ class MainWindow(QMainWindow):
     # ------------------------------
     def start_camera_stream(self):
         """启动摄像头"""
+        # 停止前的跟踪器基于旧画面初始化，重启后必须先完整检测一次
+        self._request_tracks_reset()
         if self.camera_manager.start_camera():
             self.status_label.setText("摄像头已启动")
 
@@ -233,132 +512,268 @@ class MainWindow(QMainWindow):
 
     def update_threshold(self, value):
         """调整识别置信度阈值"""
-        threshold = value / 100
-        self.face_detector.recognition_threshold = threshold
-        self.threshold_value.setText(f"{threshold:.2f}")
+        self.threshold_value.setText(f"{value / 100:.2f}")
+        self._schedule_slider_commit('threshold', value)
 
     def update_blur_strength(self, value: int):
         """调整模糊强度（缩放高斯模糊核大小）"""
-        self.blur_strength_factor = max(0.1, value / 100)
-        if 'processing' not in self.config:
-            self.config['processing'] = {}
-        self.config['processing']['blur_strength'] = self.blur_strength_factor
-        self.blur_value.setText(f"{self.blur_strength_factor:.2f}x")
+        self.blur_value.setText(f"{max(0.1, value / 100):.2f}x")
+        self._schedule_slider_commit('blur_strength', value)
+
+    def update_det_size(self, value: int):
+        """调整检测模型输入尺寸（降低可显著减少检测计算量，但远处小脸更易漏检）"""
+        value = _round_det_size(value)  # 拖动时即按 32 的倍数取整，标签与实际生效边长一致
+        self.det_size_value.setText(f"{value}px")
+        self._schedule_slider_commit('det_size', value)
+
+    def update_detection_interval(self, value: int):
+        """调整完整检测的帧间隔（中间帧由跟踪器沿用检测结果）"""
+        self.interval_value.setText(f"每 {max(1, value)} 帧")
+        self._schedule_slider_commit('detection_interval', value)
+
+    def _schedule_slider_commit(self, name: str, value: int) -> None:
+        """记录滑块的最新值，并重新开始防抖计时"""
+        self._pending_slider_values[name] = value
+        self._slider_commit_timer.start(_SLIDER_COMMIT_DELAY_MS)
+
+    def _commit_slider_state(self) -> None:
+        """滑块停止拖动后，将最终取值写入配置与检测器"""
+        pending, self._pending_slider_values = self._pending_slider_values, {}
+        processing_cfg = self.config.setdefault('processing', {})
+
+        if 'threshold' in pending:
+            self.face_detector.recognition_threshold = pending['threshold'] / 100
+
+        if 'blur_strength' in pending:
+            self.blur_strength_factor = max(0.1, pending['blur_strength'] / 100)
+            processing_cfg['blur_strength'] = self.blur_strength_factor
+
+        if 'det_size' in pending:
+            det_size = self.face_detector.set_det_size(pending['det_size'])
+            self.config['recognition']['det_size'] = det_size
+            self.det_size_value.setText(f"{det_size}px")
+
+        if 'detection_interval' in pending:
+            self.detection_interval = max(1, pending['detection_interval'])
+            processing_cfg['detection_interval'] = self.detection_interval
+            self._request_tracks_reset()
+
+    def _request_tracks_reset(self) -> None:
+        """（GUI 线程）请求处理线程在下一帧开始时丢弃现有跟踪器"""
+        self._tracks_generation += 1
 
     # ------------------------------
     # 主循环与图像处理
     # ------------------------------
     def update(self):
-        """主循环（每30ms执行一次）：获取帧→识别→模糊→显示→更新状态"""
+        """主循环（采集到新帧时触发）：取最新帧交给后台线程识别、模糊"""
+        if self._job_running:
+            return
         try:
             frame = self.camera_manager.get_frame()
-            total_faces = 0
-            total_blurred = 0
-
-            if frame is not None:
-                processed_frame, face_count, blurred_count = self.process_frame(frame)
-                total_faces += face_count
-                total_blurred += blurred_count
-                self.display_frame(processed_frame)
-
-            self.current_face_count = total_faces
-            self.current_blurred_count = total_blurred
-            self.status_label.setText(
-                f"检测到人脸: {total_faces} | 已模糊: {total_blurred}"
-            )
-            self.update_status()
-
+            if frame is None:
+                return
+            job = _FrameJob(self, frame)
+            job.signals.finished.connect(self._on_frame_processed)
+            self._job_running = True
+            self._pool.start(job)
         except Exception as e:
+            self._job_running = False
             logger.error(f"更新循环错误: {e}")
             self.status_label.setText(f"错误: {str(e)}")
 
-    def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, int, int]:
-        """检测并处理一帧画面，返回处理结果及统计信息"""
-        processed_frame = frame.copy()
+    def _on_frame_processed(self, processed_frame: Optional[np.ndarray], annotations: List[tuple],
+                            face_count: int, blurred_count: int):
+        """后台处理完成（GUI 线程）：显示结果、更新统计，并继续处理期间到达的最新帧"""
+        self._job_running = False
+        try:
+            if processed_frame is not None:
+                self.display_frame(processed_frame, annotations)
+
+            self.current_face_count = face_count
+            self.current_blurred_count = blurred_count
+            # 统计未变化时不重新设置文本，避免每帧触发状态栏重新排版
+            status_text = f"检测到人脸: {face_count} | 已模糊: {blurred_count}"
+            if status_text != self.status_label.text():
+                self.status_label.setText(status_text)
+        except Exception as e:
+            logger.error(f"更新循环错误: {e}")
+            self.status_label.setText(f"错误: {str(e)}")
+        self.update()
+
+    def process_frame(self, frame: np.ndarray) -> Tuple[Optional[np.ndarray], List[tuple], int, int]:
+        """检测并处理一帧画面，返回 (处理后的画面, 已知人脸标注 [(人脸框, 文本)], 人脸数, 模糊数)
+
+        直接在 frame 上模糊：get_frame 取走的帧归调用方所有，采集线程不会再复用它。
+        检测与跟踪使用原始分辨率；显示区域小于画面时，先缩小到显示尺寸，
+        再在缩小后的画面上模糊，减少需要处理的像素。已知人脸的框和文字不画进画面，
+        由 display_frame 在最终上屏的 QPixmap 上绘制。
+        检测、识别或跟踪失败时返回的画面为 None：无法确定人脸位置的帧不能显示
+        """
+        generation = self._tracks_generation
+        if generation != self._applied_tracks_generation:
+            self._applied_tracks_generation = generation
+            self._tracks = []
+            self._frames_since_detection = 0
 
         try:
-            faces = self.face_detector.detect_faces(frame)
+            recognized_faces = self._track_faces(frame)
+            if recognized_faces is None:
+                recognized_faces = self._detect_and_recognize(frame)
         except Exception as e:
-            logger.error(f"检测人脸失败: {e}")
-            return processed_frame, 0, 0
+            # 未经模糊的原始画面会泄露陌生人脸，丢弃本帧
+            logger.error(f"检测人脸失败，丢弃本帧: {e}")
+            return None, [], 0, 0
 
-        if not faces:
-            return processed_frame, 0, 0
+        processed_frame, scale = self._shrink_for_display(frame)
+        if not recognized_faces:
+            return processed_frame, [], 0, 0
 
-        recognized_faces = self.face_detector.recognize_faces(faces)
         blurred_count = 0
-
-        for face, known_face, confidence in recognized_faces:
-            clipped_bbox = self._clip_bbox(face.bbox, processed_frame.shape)
-            if clipped_bbox is None:
+        annotations = []
+        bboxes = [bbox for bbox, _, _ in recognized_faces]
+        if scale != 1.0:
+            bboxes = np.asarray(bboxes, dtype=np.float32) * scale
+        clipped_bboxes, valid = self._clip_bboxes(bboxes, processed_frame.shape)
+
+        for (_, known_face, confidence), clipped_bbox, is_valid in zip(
+                recognized_faces, clipped_bboxes, valid):
+            if not is_valid:
                 continue
 
             if known_face:
-                self._draw_known_face(processed_frame, clipped_bbox, known_face.name, confidence)
+                annotations.append((clipped_bbox, f"{known_face.name} {confidence:.2f}"))
             else:
                 if self._blur_face_region(processed_frame, clipped_bbox):
                     blurred_count += 1
 
-        return processed_frame, len(faces), blurred_count
-
-    def _clip_bbox(self, bbox: np.ndarray, frame_shape: Tuple[int, int, int]) -> Optional[Tuple[int, int, int, int]]:
-        """将人脸框裁剪到图像范围内"""
+        return processed_frame, annotations, len(recognized_faces), blurred_count
+
+    def _shrink_for_display(self, frame: np.ndarray) -> Tuple[np.ndarray, float]:
+        """按显示区域等比缩小画面（只缩小不放大），返回 (缩小后的画面, 缩放比例)"""
+        display_size = self._display_size
+        if display_size is None:
+            return frame, 1.0
+        h, w = frame.shape[:2]
+        scale = min(display_size[0] / w, display_size[1] / h)
+        target_size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        if scale >= 1 or target_size == (w, h):
+            return frame, 1.0
+
+        buf_shape = (target_size[1], target_size[0]) + frame.shape[2:]
+        if self._process_buf is None or self._process_buf.shape != buf_shape:
+            self._process_buf = np.empty(buf_shape, dtype=frame.dtype)
+        small = cv2.resize(frame, target_size, dst=self._process_buf, interpolation=cv2.INTER_AREA)
+        return small, target_size[0] / w
+
+    def _detect_and_recognize(self, frame: np.ndarray) -> List[tuple]:
+        """完整检测并识别一帧，返回 [(人脸框, 已知人脸或 None, 置信度)]，并据此重建跟踪器"""
+        faces = self.face_detector.detect_faces(frame, reuse_if_unchanged=True, raise_errors=True)
+        results = [(face.bbox, known_face, confidence)
+                   for face, known_face, confidence in self.face_detector.recognize_faces(faces)]
+        self._reset_tracks(frame, results)
+        return results
+
+    def _reset_tracks(self, frame: np.ndarray, results: List[tuple]) -> None:
+        """为本次检测到的每张人脸创建 MOSSE 跟踪器（全部创建成功后才一次性替换 _tracks）"""
+        self._tracks = []
+        self._frames_since_detection = 0
+        if self.detection_interval <= 1:
+            return
+        tracks = []
         try:
-            h, w = frame_shape[:2]
-            x1, y1, x2, y2 = [int(round(coord)) for coord in bbox]
-
-            x1 = max(0, min(x1, w - 1))
-            y1 = max(0, min(y1, h - 1))
-            x2 = max(0, min(x2, w))
-            y2 = max(0, min(y2, h))
-
-            if x2 <= x1 or y2 <= y1:
-                return None
-
-            return x1, y1, x2, y2
+            for bbox, known_face, confidence in results:
+                x1, y1, x2, y2 = bbox
+                tracker = _create_tracker()
+                tracker.init(frame, (int(x1), int(y1), int(x2 - x1), int(y2 - y1)))
+                tracks.append((tracker, known_face, confidence))
         except Exception as e:
-            logger.error(f"裁剪人脸框失败: {e}")
+            logger.error(f"创建人脸跟踪器失败，改为逐帧检测: {e}")
+            return
+        self._tracks = tracks
+
+    def _track_faces(self, frame: np.ndarray) -> Optional[List[tuple]]:
+        """在两次检测之间用跟踪器更新人脸框；需要重新检测（到达间隔或跟踪丢失）时返回 None"""
+        if (self.detection_interval <= 1 or not self._tracks
+                or self._frames_since_detection >= self.detection_interval - 1):
             return None
 
-    def _draw_known_face(self, image: np.ndarray, bbox: Tuple[int, int, int, int], name: str, confidence: float) -> None:
-        """在图像上标注已注册人脸"""
-        x1, y1, x2, y2 = bbox
-        cv2.rectangle(image, (x1, y1), (x2, y2), (0, 255, 0), 2)
-
+        results = []
+        for tracker, known_face, confidence in self._tracks:
+            ok, (x, y, w, h) = tracker.update(frame)
+            if not ok:
+                return None
+            results.append((np.array([x, y, x + w, y + h], dtype=np.float32), known_face, confidence))
+
+        self._frames_since_detection += 1
+        return results
+
+    def _clip_bboxes(self, bboxes: List[np.ndarray],
+                     frame_shape: Tuple[int, int, int]) -> Tuple[List[Tuple[int, int, int, int]], np.ndarray]:
+        """将本帧所有人脸框一次性裁剪到图像范围内，返回 (整数人脸框列表, 是否有效的布尔数组)"""
+        h, w = frame_shape[:2]
+        boxes = np.rint(np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)).astype(np.int32)
+        np.clip(boxes, 0, [w - 1, h - 1, w, h], out=boxes)
+        valid = (boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])
+        return [tuple(box) for box in boxes.tolist()], valid
+
+    def _draw_known_faces(self, pixmap: "QPixmap", annotations: List[tuple], scale: float) -> None:
+        """在上屏的 QPixmap 上标注已注册人脸（人脸框按 scale 换算到显示坐标）"""
+        painter = QPainter(pixmap)
         try:
-            name.encode('ascii')
-            label_text = f"{name} {confidence:.2f}"
-        except UnicodeEncodeError:
-            label_text = f"Known {confidence:.2f}"
-
-        text_org = (x1, y1 - 10 if y1 - 10 > 10 else y2 + 20)
-        cv2.putText(
-            image,
-            label_text,
-            text_org,
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.6,
-            (0, 255, 0),
-            2,
-            cv2.LINE_AA,
-        )
+            painter.setPen(QPen(_KNOWN_FACE_COLOR, 2))
+            painter.setFont(self._known_face_font)
+            for bbox, label_text in annotations:
+                x1, y1, x2, y2 = (int(round(v * scale)) for v in bbox)
+                painter.drawRect(x1, y1, x2 - x1, y2 - y1)
+                painter.drawText(x1, y1 - 10 if y1 - 10 > 10 else y2 + 20, label_text)
+        finally:
+            painter.end()
 
     def _blur_face_region(self, image: np.ndarray, bbox: Tuple[int, int, int, int]) -> bool:
-        """对指定区域进行模糊处理"""
+        """对指定区域进行模糊处理（马赛克或高斯模糊）"""
         x1, y1, x2, y2 = bbox
         face_region = image[y1:y2, x1:x2]
         if face_region.size == 0:
             return False
 
-        kernel = self._calculate_blur_kernel(x2 - x1, y2 - y1)
         try:
-            blurred = cv2.GaussianBlur(face_region, (kernel, kernel), 0)
+            if self.blur_mode == 'gaussian':
+                kernel = self._calculate_blur_kernel(x2 - x1, y2 - y1)
+                blurred = self._box_blur3(face_region, kernel)
+            else:
+                blurred = self._pixelate(face_region)
             image[y1:y2, x1:x2] = blurred
             return True
         except Exception as e:
             logger.error(f"模糊陌生人脸失败: {e}")
             return False
 
+    def _pixelate(self, region: np.ndarray) -> np.ndarray:
+        """马赛克：按区域平均缩小为少量色块，再用最近邻放大回原尺寸"""
+        h, w = region.shape[:2]
+        # 长边方向的色块数，模糊倍率越大色块越少越粗
+        cells = max(2, int(round(_PIXELATE_CELLS / self.blur_strength_factor)))
+        scale = min(1.0, cells / max(w, h))
+        small = cv2.resize(
+            region,
+            (max(1, int(round(w * scale))), max(1, int(round(h * scale)))),
+            interpolation=cv2.INTER_AREA
+        )
+        return cv2.resize(small, (w, h), interpolation=cv2.INTER_NEAREST)
+
+    @staticmethod
+    def _box_blur3(region: np.ndarray, kernel: int) -> np.ndarray:
+        """三次均值滤波近似高斯模糊：均值滤波的开销与核大小无关，大核时远快于 GaussianBlur
+
+        按 OpenCV 对 ksize 的默认 sigma 取值，选取方差相同的三次盒式滤波宽度（取奇数，偶数宽度每次滤波会偏移半个像素）
+        """
+        sigma = 0.3 * ((kernel - 1) * 0.5 - 1) + 0.8
+        box = max(1, int(round(math.sqrt(4 * sigma * sigma + 1)))) | 1
+        blurred = cv2.blur(region, (box, box))
+        blurred = cv2.blur(blurred, (box, box))
+        return cv2.blur(blurred, (box, box))
+
     def _calculate_blur_kernel(self, width: int, height: int) -> int:
         """根据人脸尺寸自适应计算高斯模糊核大小（保持为奇数）"""
         base = max(width, height) // 6
@@ -368,45 +783,61 @@ class MainWindow(QMainWindow):
             scaled_kernel += 1
         return max(3, scaled_kernel)
 
-    def display_frame(self, frame: np.ndarray):
-        """将处理后的画面显示到摄像头窗口"""
+    def display_frame(self, frame: np.ndarray, annotations: Optional[List[tuple]] = None):
+        """将处理后的画面显示到摄像头窗口，并在其上绘制已知人脸标注"""
         try:
             if frame is None:
                 return
+            self._display_size = (self.camera_label.width(), self.camera_label.height())
+
+            # 超过显示器刷新率的画面用户看不到，只做检测与统计，不再缩放和上屏
+            now = time.monotonic_ns()
+            if now - self._last_shown_ns < _DISPLAY_INTERVAL_NS:
+                return
+            self._last_shown_ns = now
+
+            # 先在 BGR 数组上用 OpenCV 缩放到窗口大小（保持比例），再交给 Qt 显示，不再做 Qt 平滑缩放
+            h, w = frame.shape[:2]
+            scale = min(self.camera_label.width() / w, self.camera_label.height() / h)
+            target_size = (max(1, int(w * scale)), max(1, int(h * scale)))
+            if target_size != (w, h):
+                # 缩放结果写入复用的缓冲区，窗口尺寸不变时每帧不再新分配图像内存
+                buf_shape = (target_size[1], target_size[0]) + frame.shape[2:]
+                if self._display_buf is None or self._display_buf.shape != buf_shape:
+                    self._display_buf = np.empty(buf_shape, dtype=frame.dtype)
+                frame = cv2.resize(
+                    frame, target_size, dst=self._display_buf,
+                    interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+                )
+
             pixmap = numpy_to_pixmap(frame)
             if pixmap is None:
                 return
-            scaled = pixmap.scaled(
-                self.camera_label.size(),
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
-            self.camera_label.setPixmap(scaled)
+            if annotations:
+                self._draw_known_faces(pixmap, annotations, target_size[0] / w)
+            self.camera_label.setPixmap(pixmap)
         except Exception as e:
             logger.error(f"显示帧错误: {e}")
 
     def update_status(self):
         """更新系统状态信息：摄像头、人脸库、模糊统计"""
         try:
-            status_text = []
-
-            status_text.append("=== 摄像头状态 ===")
-            camera_status = self.camera_manager.get_camera_status()
-            if camera_status:
-                running = '运行中' if camera_status['running'] else '已停止'
-                status_text.append(f"{camera_status['name']}：{running}")
+            if self._status_camera_prefix is None:
+                camera_line = "未加载摄像头配置"
             else:
-                status_text.append("未加载摄像头配置")
-
-            status_text.append("\n=== 人脸库 ===")
-            status_text.append(f"已知人脸数量：{len(self.face_detector.known_faces)}")
-
-            status_text.append("\n=== 实时统计 ===")
-            status_text.append(f"当前检测到的人脸数量：{self.current_face_count}")
-            status_text.append(f"当前被模糊的人脸数量：{self.current_blurred_count}")
-            status_text.append(f"当前模糊范围倍率：{self.blur_strength_factor:.2f}x")
-
-            self.status_display.setText("\n".join(status_text))
+                running = '运行中' if self.camera_manager.is_running() else '已停止'
+                camera_line = self._status_camera_prefix + running
+
+            status_text = _STATUS_TEMPLATE.format(
+                camera=camera_line,
+                known=len(self.face_detector.known_faces),
+                faces=self.current_face_count,
+                blurred=self.current_blurred_count,
+                blur=self.blur_strength_factor
+            )
+            # 内容未变化时不重新设置文本，避免无谓的重新排版
+            if status_text != self.status_display.text():
+                self.status_display.setText(status_text)
 
         except Exception as e:
             logger.error(f"更新状态失败: {e}")
@@ -416,6 +847,7 @@ class MainWindow(QMainWindow):
         try:
             self.camera_manager.stop_camera()
             self.update_timer.stop()
+            self._pool.waitForDone()
             event.accept()
         except Exception as e:
             logger.error(f"关闭程序时出错: {e}")
@@ -423,73 +855,4 @@ class MainWindow(QMainWindow):
 
     def apply_styles(self):
         """统一设置应用的样式和色彩风格"""
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #0f172a;
-                color: #e2e8f0;
-            }
-            QLabel {
-                color: #e2e8f0;
-            }
-            QLabel#sectionTitle {
-                font-size: 20px;
-                font-weight: 600;
-                padding: 8px 0;
-                color: #93c5fd;
-            }
-            QLabel#cameraFeed {
-                background-color: #1e293b;
-                border-radius: 12px;
-                border: 2px solid #1d4ed8;
-            }
-            QTabWidget::pane {
-                border: 1px solid #1d4ed8;
-                border-radius: 10px;
-                background-color: #111c34;
-            }
-            QTabBar::tab {
-                padding: 10px 24px;
-                background-color: transparent;
-                color: #cbd5f5;
-                border-bottom: 2px solid transparent;
-            }
-            QTabBar::tab:selected {
-                background-color: #1e3a8a;
-                border-top-left-radius: 8px;
-                border-top-right-radius: 8px;
-                color: #ffffff;
-                border-bottom: 2px solid #60a5fa;
-            }
-            QPushButton {
-                background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:0, y2:1, stop:0 #2563eb, stop:1 #1e40af);
-                border: 2px solid #60a5fa;
-                border-radius: 10px;
-                padding: 10px 20px;
-                color: #ffffff;
-                font-weight: 600;
-            }
-            QPushButton:hover {
-                background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:0, y2:1, stop:0 #3b82f6, stop:1 #1d4ed8);
-                border: 2px solid #93c5fd;
-            }
-            QPushButton:pressed {
-                background-color: qlineargradient(spread:pad, x1:0, y1:0, x2:0, y2:1, stop:0 #1d4ed8, stop:1 #1e3a8a);
-                border: 2px solid #3b82f6;
-                padding-top: 12px;
-                padding-bottom: 8px;
-            }
-            QGroupBox {
-                border: 1px solid #1d4ed8;
-                border-radius: 12px;
-                margin-top: 12px;
-                padding: 16px;
-                font-weight: 600;
-                background-color: rgba(30, 64, 175, 0.35);
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                subcontrol-position: top left;
-                padding: 0 10px;
-                color: #bfdbfe;
-            }
-        """)
+        self.setStyleSheet(_STYLESHEET)